@@ -1,30 +1,343 @@
-with open("aoc1i.txt") as f:
-    input = f.read().splitlines()
-pos = 50
-max_pos = 99
-ans_p1 = 0
-ans_p2 = 0
-steps_to_zero = 50
-for line in input:
-    direction = line[0]
-    abs_steps = int(line[1:])
-    if direction == "L":
-        steps = -abs_steps
-        steps_to_zero = pos
-    else:
-        steps = abs_steps
-        if pos == 0:
-            steps_to_zero = 0
+"""Day 1 merged runner.
+
+Provides `solve(lines)` which replays the dial one rotation at a time and
+`solve_numpy(steps)` which computes the same two answers for a whole log
+at once from a signed int64 array of rotations. `solve_stream(stream)`
+feeds the vectorized engine fixed-size byte chunks so a log never has to
+fit in memory. `simulate_sessions(sessions)` replays many independent
+dials, each with its own log, start position and wheel size, across a
+process pool. `DialIndex` stores prefix positions and counters of a log
+so replay queries over any instruction range are O(1). `main()` reads
+the input file (or stdin, or every file in a directory) and prints
+part 1 (zero landings) and part 2 (zero crossings).
+"""
+from concurrent.futures import ProcessPoolExecutor
+from typing import BinaryIO, Iterable, List, NamedTuple, Optional, Sequence, Tuple
+import argparse
+import hashlib
+import os
+import sys
+
+import numpy as np
+
+START_POS = 50
+MAX_POS = 99
+
+
+class DialSession(NamedTuple):
+    """One dial replay: a rotation log plus the dial it runs on."""
+
+    path: str
+    start: int = START_POS
+    max_pos: int = MAX_POS
+
+
+def solve(lines: Iterable[str], start: int = START_POS, max_pos: int = MAX_POS) -> Tuple[int, int]:
+    """Replay rotations one line at a time and return (part1, part2)."""
+    pos = start
+    ans_p1 = 0
+    ans_p2 = 0
+    for line in lines:
+        line = line.strip()
+        if not line:
+            continue
+        direction = line[0]
+        abs_steps = int(line[1:])
+        if direction == "L":
+            steps = -abs_steps
+            steps_to_zero = pos
         else:
-            steps_to_zero = max_pos + 1 - pos
-    tmp = pos + steps
-    if abs_steps >= steps_to_zero:
-        # Prevent double counting when pointer is already at 0
-        if pos != 0:
-            ans_p2 += 1
-        ans_p2 += (abs_steps - steps_to_zero) // (max_pos + 1)
-    pos = tmp % (max_pos + 1)
-    if pos == 0:
-        ans_p1 += 1
-print(ans_p1)
-print(ans_p2)
+            steps = abs_steps
+            if pos == 0:
+                steps_to_zero = 0
+            else:
+                steps_to_zero = max_pos + 1 - pos
+        tmp = pos + steps
+        if abs_steps >= steps_to_zero:
+            # Prevent double counting when pointer is already at 0
+            if pos != 0:
+                ans_p2 += 1
+            ans_p2 += (abs_steps - steps_to_zero) // (max_pos + 1)
+        pos = tmp % (max_pos + 1)
+        if pos == 0:
+            ans_p1 += 1
+    return ans_p1, ans_p2
+
+
+def parse_rotations(text: str) -> np.ndarray:
+    """Parse 'L<n>' / 'R<n>' lines into signed int64 steps (L negative)."""
+    if not text.strip():
+        # np.fromstring turns whitespace-only text into [0], a phantom step
+        return np.empty(0, dtype=np.int64)
+    numeric = text.translate(str.maketrans({"L": "-", "R": None}))
+    return np.fromstring(numeric, dtype=np.int64, sep=" ")
+
+
+def _step_counts(steps: np.ndarray, start: int, max_pos: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Return (unwrapped positions, per-step zero landings, per-step zero crossings).
+
+    Works on the unwrapped dial position `S` (start plus cumulative sum).
+    A right turn from S[i-1] to S[i] passes 0 once for every multiple of
+    the dial size in (S[i-1], S[i]]; a left turn for every multiple in
+    [S[i], S[i-1]). Both are differences of floor divisions, which also
+    gives the "already at 0" rule for free: the starting point is never
+    inside its own interval.
+    """
+    size = max_pos + 1
+    unwrapped = np.empty(steps.size + 1, dtype=np.int64)
+    unwrapped[0] = start
+    np.cumsum(steps, out=unwrapped[1:])
+    unwrapped[1:] += start
+    prev, curr = unwrapped[:-1], unwrapped[1:]
+
+    hits = curr % size == 0
+    crossings = np.where(
+        steps > 0,
+        curr // size - prev // size,
+        (prev - 1) // size - (curr - 1) // size,
+    )
+    return unwrapped, hits, crossings
+
+
+def _count_chunk(steps: np.ndarray, start: int, max_pos: int = MAX_POS) -> Tuple[int, int, int]:
+    """Return (end position, part1, part2) for `steps` starting at `start`."""
+    if steps.size == 0:
+        return start, 0, 0
+    unwrapped, hits, crossings = _step_counts(steps, start, max_pos)
+    end = int(unwrapped[-1] % (max_pos + 1))
+    return end, int(np.count_nonzero(hits)), int(crossings.sum())
+
+
+class DialIndex:
+    """Prefix arrays over a rotation log for constant-time replay queries.
+
+    `positions[i]` is the dial position after the first `i` instructions
+    (`positions[0]` is the start) and `hits[i]` / `crossings[i]` are the
+    part 1 / part 2 counters accumulated over those instructions. Each
+    array uses the narrowest unsigned dtype that holds its largest value.
+    `source` identifies the log the index was built from (a digest of its
+    bytes, or "" if unknown).
+    """
+
+    def __init__(
+        self,
+        positions: np.ndarray,
+        hits: np.ndarray,
+        crossings: np.ndarray,
+        start: int,
+        max_pos: int,
+        source: str = "",
+    ):
+        self.positions = positions
+        self.hits = hits
+        self.crossings = crossings
+        self.start = start
+        self.max_pos = max_pos
+        self.source = source
+
+    @classmethod
+    def build(
+        cls,
+        steps: np.ndarray,
+        start: int = START_POS,
+        max_pos: int = MAX_POS,
+        source: str = "",
+    ) -> "DialIndex":
+        unwrapped, hits, crossings = _step_counts(steps, start, max_pos)
+        prefix_hits = np.zeros(steps.size + 1, dtype=np.int64)
+        np.cumsum(hits, out=prefix_hits[1:])
+        prefix_crossings = np.zeros(steps.size + 1, dtype=np.int64)
+        np.cumsum(crossings, out=prefix_crossings[1:])
+        return cls(
+            _narrow(unwrapped % (max_pos + 1), max_pos),
+            _narrow(prefix_hits, int(prefix_hits[-1])),
+            _narrow(prefix_crossings, int(prefix_crossings[-1])),
+            start,
+            max_pos,
+            source,
+        )
+
+    def __len__(self) -> int:
+        """Number of instructions in the indexed log."""
+        return self.positions.size - 1
+
+    def matches(self, source: str, start: int, max_pos: int) -> bool:
+        """True if the index was built from `source` on the same dial."""
+        return (self.source, self.start, self.max_pos) == (source, start, max_pos)
+
+    def _check(self, i: int, j: Optional[int] = None) -> None:
+        # Reject negative indices instead of letting NumPy wrap them.
+        if not 0 <= i <= len(self) or (j is not None and not i <= j <= len(self)):
+            bounds = i if j is None else f"{i}..{j}"
+            raise IndexError(f"instruction range {bounds} outside 0..{len(self)}")
+
+    def position_after(self, i: int) -> int:
+        """Dial position after the first `i` instructions."""
+        self._check(i)
+        return int(self.positions[i])
+
+    def zero_hits(self, i: int, j: int) -> int:
+        """Part 1 count for instructions `i` (inclusive) to `j` (exclusive)."""
+        self._check(i, j)
+        return int(self.hits[j]) - int(self.hits[i])
+
+    def zero_crossings(self, i: int, j: int) -> int:
+        """Part 2 count for instructions `i` (inclusive) to `j` (exclusive)."""
+        self._check(i, j)
+        return int(self.crossings[j]) - int(self.crossings[i])
+
+    def save(self, path: str) -> None:
+        # np.savez appends ".npz" to bare names; write through a handle so
+        # `path` is used as given.
+        with open(path, "wb") as f:
+            np.savez(
+                f,
+                positions=self.positions,
+                hits=self.hits,
+                crossings=self.crossings,
+                meta=np.array([self.start, self.max_pos], dtype=np.int64),
+                source=np.array(self.source),
+            )
+
+    @classmethod
+    def load(cls, path: str) -> "DialIndex":
+        with np.load(path) as data:
+            start, max_pos = (int(v) for v in data["meta"])
+            source = str(data["source"]) if "source" in data else ""
+            return cls(data["positions"], data["hits"], data["crossings"], start, max_pos, source)
+
+
+def _narrow(values: np.ndarray, largest: int) -> np.ndarray:
+    return values.astype(np.min_scalar_type(largest))
+
+
+def solve_numpy(steps: np.ndarray, start: int = START_POS, max_pos: int = MAX_POS) -> Tuple[int, int]:
+    """Vectorized equivalent of `solve` over an array of signed steps."""
+    _, ans_p1, ans_p2 = _count_chunk(steps, start, max_pos)
+    return ans_p1, ans_p2
+
+
+def solve_stream(
+    stream: BinaryIO,
+    chunk_size: int = 1 << 20,
+    start: int = START_POS,
+    max_pos: int = MAX_POS,
+) -> Tuple[int, int]:
+    """Replay a rotation log read from `stream` in `chunk_size` byte chunks.
+
+    Only complete lines are handed to the vectorized engine; a line split
+    across a chunk boundary is carried over to the next read. The dial
+    position and both counters are the only state kept between chunks.
+    """
+    if chunk_size <= 0:
+        raise ValueError("chunk_size must be positive")
+    pos = start
+    ans_p1 = 0
+    ans_p2 = 0
+    tail = b""
+    while True:
+        chunk = stream.read(chunk_size)
+        if not chunk:
+            break
+        data = tail + chunk
+        cut = data.rfind(b"\n") + 1
+        tail = data[cut:]
+        if cut:
+            pos, p1, p2 = _count_chunk(parse_rotations(data[:cut].decode("ascii")), pos, max_pos)
+            ans_p1 += p1
+            ans_p2 += p2
+    if tail.strip():
+        pos, p1, p2 = _count_chunk(parse_rotations(tail.decode("ascii")), pos, max_pos)
+        ans_p1 += p1
+        ans_p2 += p2
+    return ans_p1, ans_p2
+
+
+def _run_session(session: DialSession, chunk_size: int) -> Tuple[int, int]:
+    with open(session.path, "rb") as f:
+        return solve_stream(f, chunk_size, session.start, session.max_pos)
+
+
+def simulate_sessions(
+    sessions: Sequence[DialSession],
+    workers: Optional[int] = None,
+    chunk_size: int = 1 << 20,
+) -> List[Tuple[int, int]]:
+    """Return (part1, part2) for every session, in the order given.
+
+    Sessions are independent, so they are handed to a process pool in
+    batches (several sessions per task keeps the pickling overhead small
+    when there are thousands of short logs). Each worker streams its own
+    log from disk; only the two counters travel back to the parent.
+    """
+    sessions = list(sessions)
+    workers = workers or os.cpu_count() or 1
+    if workers == 1 or len(sessions) <= 1:
+        return [_run_session(s, chunk_size) for s in sessions]
+    batch = max(1, len(sessions) // (workers * 4))
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(_run_session, sessions, [chunk_size] * len(sessions), chunksize=batch))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run part 1 and part 2 for day 1")
+    parser.add_argument("input", nargs="?", default="aoc1i.txt", help="input file path")
+    parser.add_argument("--numpy", action="store_true", help="use the vectorized batch engine")
+    parser.add_argument("--stream", action="store_true", help="process the input in fixed-size chunks ('-' reads stdin)")
+    parser.add_argument("--chunk-size", type=int, default=1 << 20, help="bytes per chunk in --stream mode")
+    parser.add_argument("--start", type=int, default=START_POS, help="starting dial position")
+    parser.add_argument("--max-pos", type=int, default=MAX_POS, help="highest dial position (wheel size - 1)")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes when input is a directory")
+    parser.add_argument("--index", help="prefix index file; loaded if present, otherwise built from input and saved")
+    parser.add_argument("--at", type=int, help="with --index: print the position after this many instructions")
+    parser.add_argument("--between", type=int, nargs=2, metavar=("I", "J"),
+                        help="with --index: print zero hits and crossings for instructions I..J-1")
+    args = parser.parse_args()
+    if (args.at is not None or args.between) and not args.index:
+        parser.error("--at and --between require --index")
+
+    if args.index:
+        with open(args.input, "rb") as f:
+            raw = f.read()
+        source = hashlib.sha256(raw).hexdigest()
+        index = DialIndex.load(args.index) if os.path.exists(args.index) else None
+        if index is None or not index.matches(source, args.start, args.max_pos):
+            # Missing, or built from another log or dial: rebuild it.
+            index = DialIndex.build(parse_rotations(raw.decode("ascii")), args.start, args.max_pos, source)
+            index.save(args.index)
+        i, j = args.between if args.between else (0, len(index))
+        try:
+            if args.at is not None:
+                print(index.position_after(args.at))
+            print(index.zero_hits(i, j))
+            print(index.zero_crossings(i, j))
+        except IndexError as e:
+            parser.error(str(e))
+        return
+
+    if os.path.isdir(args.input):
+        names = sorted(os.listdir(args.input))
+        sessions = [DialSession(os.path.join(args.input, n), args.start, args.max_pos) for n in names]
+        results = simulate_sessions(sessions, args.workers, args.chunk_size)
+        for name, (ans_p1, ans_p2) in zip(names, results):
+            print(name, ans_p1, ans_p2)
+        return
+
+    if args.stream and args.input == "-":
+        ans_p1, ans_p2 = solve_stream(sys.stdin.buffer, args.chunk_size, args.start, args.max_pos)
+    elif args.stream:
+        with open(args.input, "rb") as f:
+            ans_p1, ans_p2 = solve_stream(f, args.chunk_size, args.start, args.max_pos)
+    else:
+        with open(args.input, "r", encoding="utf-8") as f:
+            if args.numpy:
+                ans_p1, ans_p2 = solve_numpy(parse_rotations(f.read()), args.start, args.max_pos)
+            else:
+                ans_p1, ans_p2 = solve(f.read().splitlines(), args.start, args.max_pos)
+
+    print(ans_p1)
+    print(ans_p2)
+
+
+if __name__ == "__main__":
+    main()
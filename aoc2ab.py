@@ -1,106 +1,387 @@
 """Day 2 merged runner.
 
 Provides `parta(lines)` using the exact-two-block rule and
-`partb(lines)` using the repeated-pattern rule. `main()` reads an
-input file once and prints both parts' invalid numbers and totals.
+`partb(lines)` using the repeated-pattern rule; both yield invalid
+numbers lazily. They generate the repeated-block numbers of each range
+directly instead of testing every integer in it. Items from all lines
+are first merged into disjoint segments (`normalize_ranges`) so
+overlapping ranges are scanned once, either per occurrence or, with
+`unique=True`, per distinct ID. `summarize(lines, rule)` gives the count
+and sum in closed form, and `scan(lines, rules)` evaluates any set of
+registered rules in one pass. `main()` reads an input file once and
+writes both parts' invalid numbers and totals in buffered batches, or
+only the totals with `--summary-only`.
 """
-from typing import Iterable, List
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache, partial, reduce
+from itertools import combinations, islice
+from math import gcd
+from typing import Callable, Dict, Iterable, Iterator, List, NamedTuple, Optional, Sequence, TextIO, Tuple
 import argparse
+import heapq
+import sys
 
+# Maps a digit length to the block sizes (periods) a rule accepts.
+PeriodRule = Callable[[int], Tuple[int, ...]]
 
-def is_exact_two_block_repeat(s: str) -> bool:
-    if not s:
-        return False
-    if len(s) % 2 != 0:
-        return False
-    half = len(s) // 2
-    return s[:half] == s[half:]
 
+def parse_item(item: str) -> Optional[Tuple[int, int]]:
+    """Return inclusive (start, end) bounds for a number or a 'start-end' range.
 
-def is_repeated_pattern(s: str) -> bool:
-    n = len(s)
-    if n == 0:
-        return False
-    for size in range(1, n // 2 + 1):
-        if n % size == 0:
-            block = s[:size]
-            if block * (n // size) == s:
-                return True
-    return False
-
-
-def expand_item(item: str):
-    """Yield integers for a single item which may be a number or a range 'start-end'."""
+    Reversed ranges are flipped; blank or malformed items yield None.
+    """
     item = item.strip()
     if not item:
-        return
-    if "-" in item:
-        try:
+        return None
+    try:
+        if "-" in item:
             start_str, end_str = item.split("-", 1)
             start, end = int(start_str), int(end_str)
-            if start <= end:
-                for v in range(start, end + 1):
-                    yield v
-            else:
-                for v in range(end, start + 1):
-                    yield v
-        except ValueError:
-            return
-    else:
-        try:
-            yield int(item)
-        except ValueError:
-            return
-
-
-def parta(lines: Iterable[str]) -> List[int]:
-    """Collect invalid numbers using the exact-two-block rule."""
-    invalids: List[int] = []
-    for line in lines:
-        parts = [p.strip() for p in line.strip().split(",") if p.strip()]
-        for p in parts:
-            for num in expand_item(p):
-                if is_exact_two_block_repeat(str(num)):
-                    invalids.append(num)
-    return invalids
+            return (start, end) if start <= end else (end, start)
+        value = int(item)
+        return value, value
+    except ValueError:
+        return None
 
 
-def partb(lines: Iterable[str]) -> List[int]:
-    """Collect invalid numbers using the repeated-pattern rule."""
-    invalids: List[int] = []
+def iter_bounds(lines: Iterable[str]) -> Iterator[Tuple[int, int]]:
+    """Yield the bounds of every comma-separated item, in input order."""
     for line in lines:
-        parts = [p.strip() for p in line.strip().split(",") if p.strip()]
-        for p in parts:
-            for num in expand_item(p):
-                if is_repeated_pattern(str(num)):
-                    invalids.append(num)
-    return invalids
+        for p in line.strip().split(","):
+            bounds = parse_item(p)
+            if bounds is not None:
+                yield bounds
+
+
+def normalize_ranges(lines: Iterable[str], unique: bool = False) -> List[Tuple[int, int, int]]:
+    """Return sorted, disjoint (start, end, multiplicity) segments for `lines`.
+
+    Every item of every line is parsed into an interval and swept once.
+    `multiplicity` is the number of input items covering the segment, so
+    overlapping regions are only scanned once but can still be reported
+    per occurrence; with `unique=True` it is always 1.
+    """
+    events: List[Tuple[int, int]] = []
+    for start, end in iter_bounds(lines):
+        events.append((start, 1))
+        events.append((end + 1, -1))
+    events.sort()
+
+    segments: List[Tuple[int, int, int]] = []
+    depth = 0
+    i = 0
+    while i < len(events):
+        at = events[i][0]
+        while i < len(events) and events[i][0] == at:
+            depth += events[i][1]
+            i += 1
+        if depth == 0 or i == len(events):
+            continue
+        mult = 1 if unique else depth
+        nxt = events[i][0]
+        if segments and segments[-1][1] + 1 == at and segments[-1][2] == mult:
+            segments[-1] = (segments[-1][0], nxt - 1, mult)
+        else:
+            segments.append((at, nxt - 1, mult))
+    return segments
+
+
+@lru_cache(maxsize=None)
+def proper_divisors(n: int) -> Tuple[int, ...]:
+    """Block sizes that tile a length-`n` string more than once, shared by all rules."""
+    return tuple(size for size in range(1, n // 2 + 1) if n % size == 0)
+
+
+def two_block_periods(n: int) -> Tuple[int, ...]:
+    """Block sizes accepted by the exact-two-block rule for length `n`."""
+    return (n // 2,) if n % 2 == 0 else ()
+
+
+def repeat_periods(n: int) -> Tuple[int, ...]:
+    """Block sizes accepted by the repeated-pattern rule for length `n`."""
+    return proper_divisors(n)
+
+
+def _k_block(k: int, n: int) -> Tuple[int, ...]:
+    size = n // k
+    return (size,) if k > 1 and n % k == 0 and size in proper_divisors(n) else ()
+
+
+def k_block_periods(k: int) -> PeriodRule:
+    """Rule accepting strings made of exactly `k` copies of one block."""
+    # A partial of a module-level function pickles, so the rule can be
+    # shipped to worker processes.
+    return partial(_k_block, k)
+
+
+class RuleResult(NamedTuple):
+    count: int
+    total: int
+    samples: List[int]
+
+
+# Registered rules by name; `scan` evaluates any subset of them together.
+RULES: Dict[str, PeriodRule] = {}
+
+
+def register_rule(name: str, periods: PeriodRule) -> None:
+    RULES[name] = periods
+
+
+register_rule("two-block", two_block_periods)
+register_rule("repeat", repeat_periods)
+
+
+@lru_cache(maxsize=None)
+def _union_terms(periods: Tuple[int, ...]) -> Tuple[Tuple[int, int], ...]:
+    """Inclusion-exclusion terms (sign, period) for 'has any of `periods`'.
+
+    A string of length n with period p (p | n) also has every period that
+    p divides, so only periods not dividing another one matter. Having
+    two periods p and q (both proper divisors of n) means having period
+    gcd(p, q), so every intersection is again a single period.
+    """
+    maximal = [p for p in periods if not any(q != p and q % p == 0 for q in periods)]
+    terms = []
+    for r in range(1, len(maximal) + 1):
+        for subset in combinations(maximal, r):
+            terms.append((1 if r % 2 else -1, reduce(gcd, subset)))
+    return tuple(terms)
+
+
+def _block_span(lo: int, hi: int, n: int, p: int) -> Tuple[int, int, int]:
+    """Return (first block, last block, multiplier) of n-digit period-p numbers in [lo, hi].
+
+    Every such number is `block * multiplier` with `multiplier` = 1 followed
+    by (n // p - 1) copies of the p-digit pattern "0...01".
+    """
+    multiplier = (10 ** n - 1) // (10 ** p - 1)
+    first = max(10 ** (p - 1), -(-lo // multiplier))
+    last = min(10 ** p - 1, hi // multiplier)
+    return first, last, multiplier
+
+
+def _length_spans(start: int, end: int) -> Iterator[Tuple[int, int, int]]:
+    """Split [start, end] into (digit length, lo, hi) pieces."""
+    start = max(start, 1)
+    for n in range(len(str(start)), len(str(end)) + 1):
+        yield n, max(start, 10 ** (n - 1)), min(end, 10 ** n - 1)
 
 
-def _print_results(title: str, invalids: List[int]):
-    print(f"\n=== {title} ===")
-    if invalids:
-        for n in invalids:
-            print(n)
-    else:
-        print("(none)")
-    print("\nTotal Invalid Count:", len(invalids))
-    print("Sum of Invalid Numbers:", sum(invalids) if invalids else 0)
+def iter_repeats(start: int, end: int, periods: PeriodRule) -> Iterator[int]:
+    """Yield, in ascending order, the numbers in [start, end] matching `periods`.
+
+    Only candidate numbers are generated: for each digit length the
+    repeated blocks of each maximal period are clipped to the range and
+    merged, so the cost is proportional to the output, not the range.
+    """
+    for n, lo, hi in _length_spans(start, end):
+        streams = []
+        for sign, p in _union_terms(periods(n)):
+            if sign < 0:
+                continue
+            first, last, multiplier = _block_span(lo, hi, n, p)
+            streams.append(range(first * multiplier, last * multiplier + 1, multiplier))
+        previous = None
+        for value in heapq.merge(*streams):
+            if value != previous:
+                yield value
+                previous = value
+
+
+def count_repeats(start: int, end: int, periods: PeriodRule) -> Tuple[int, int]:
+    """Return (count, sum) of the numbers in [start, end] matching `periods`.
+
+    Computed in closed form per digit length and period, nothing is
+    enumerated.
+    """
+    count = total = 0
+    for n, lo, hi in _length_spans(start, end):
+        for sign, p in _union_terms(periods(n)):
+            first, last, multiplier = _block_span(lo, hi, n, p)
+            if first > last:
+                continue
+            blocks = last - first + 1
+            count += sign * blocks
+            total += sign * multiplier * (first + last) * blocks // 2
+    return count, total
+
+
+def summarize(lines: Iterable[str], periods: PeriodRule, unique: bool = False) -> Tuple[int, int]:
+    """Return (count, sum) of matching numbers over every item of `lines`."""
+    count = total = 0
+    for start, end, mult in normalize_ranges(lines, unique):
+        c, t = count_repeats(start, end, periods)
+        count += c * mult
+        total += t * mult
+    return count, total
+
+
+def _shards(segments: Iterable[Tuple[int, int, int]]) -> Iterator[Tuple[int, int, int]]:
+    """Split segments at digit-length boundaries."""
+    for start, end, mult in segments:
+        for _, lo, hi in _length_spans(start, end):
+            yield lo, hi, mult
+
+
+def _scan_shards(
+    shards: Sequence[Tuple[int, int, int]],
+    rules: Sequence[Tuple[str, PeriodRule]],
+    samples: Optional[int],
+) -> Dict[str, RuleResult]:
+    """Count, sum and sample every rule over `shards`, in order."""
+    results = {}
+    for name, periods in rules:
+        count = total = 0
+        kept: List[int] = []
+        for start, end, mult in shards:
+            c, t = count_repeats(start, end, periods)
+            if not c:
+                continue
+            count += c * mult
+            total += t * mult
+            if samples is None or len(kept) < samples:
+                for num in iter_repeats(start, end, periods):
+                    kept.extend([num] * mult)
+                    if samples is not None and len(kept) >= samples:
+                        del kept[samples:]
+                        break
+        results[name] = RuleResult(count, total, kept)
+    return results
+
+
+def scan(
+    lines: Iterable[str],
+    rules: Optional[Sequence[str]] = None,
+    samples: Optional[int] = 0,
+    unique: bool = False,
+    workers: int = 1,
+) -> Dict[str, RuleResult]:
+    """Evaluate several rules over `lines` in a single pass.
+
+    The input is parsed and normalized once, then split into shards at
+    digit-length boundaries and counted for each rule (default: all
+    registered rules). Up to `samples` matching numbers are kept per
+    rule, in the same order and multiplicity as `parta`/`partb` report
+    them; `None` keeps them all.
+
+    With `workers > 1` contiguous batches of shards go to a process pool.
+    Each worker returns only counts, sums and at most `samples` numbers
+    per rule, and batches are merged in input order, so the result is
+    the same as the serial run.
+    """
+    names = list(RULES) if rules is None else list(rules)
+    selected = [(name, RULES[name]) for name in names]
+    shards = list(_shards(normalize_ranges(lines, unique)))
+    if workers <= 1 or len(shards) <= 1:
+        return _scan_shards(shards, selected, samples)
+
+    size = -(-len(shards) // (workers * 4))
+    batches = [shards[i:i + size] for i in range(0, len(shards), size)]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        partials = list(pool.map(_scan_shards, batches, [selected] * len(batches), [samples] * len(batches)))
+
+    merged = {}
+    for name in names:
+        count = total = 0
+        kept: List[int] = []
+        for part in partials:
+            count += part[name].count
+            total += part[name].total
+            kept.extend(part[name].samples)
+        merged[name] = RuleResult(count, total, kept if samples is None else kept[:samples])
+    return merged
+
+
+def _iter_segment_invalids(segments: Iterable[Tuple[int, int, int]], periods: PeriodRule) -> Iterator[int]:
+    """Yield the invalid numbers of normalized `segments`, `mult` times each."""
+    for start, end, mult in segments:
+        for num in iter_repeats(start, end, periods):
+            for _ in range(mult):
+                yield num
+
+
+def _iter_invalids(lines: Iterable[str], periods: PeriodRule, unique: bool) -> Iterator[int]:
+    return _iter_segment_invalids(normalize_ranges(lines, unique), periods)
+
+
+def parta(lines: Iterable[str], unique: bool = False) -> Iterator[int]:
+    """Lazily yield invalid numbers using the exact-two-block rule.
+
+    Numbers come out in ascending order; one covered by several ranges is
+    listed once per range unless `unique` is set.
+    """
+    return _iter_invalids(lines, two_block_periods, unique)
+
+
+def partb(lines: Iterable[str], unique: bool = False) -> Iterator[int]:
+    """Lazily yield invalid numbers using the repeated-pattern rule.
+
+    Numbers come out in ascending order; one covered by several ranges is
+    listed once per range unless `unique` is set.
+    """
+    return _iter_invalids(lines, repeat_periods, unique)
+
+
+def _write_results(title: str, invalids: Iterable[int], out: TextIO, batch_size: int = 1 << 16):
+    """Write `invalids` in batches of `batch_size` lines, then the totals.
+
+    Only the current batch and the running count and sum are kept.
+    """
+    out.write(f"\n=== {title} ===\n")
+    count = total = 0
+    it = iter(invalids)
+    while True:
+        batch = list(islice(it, batch_size))
+        if not batch:
+            break
+        out.write("\n".join(map(str, batch)))
+        out.write("\n")
+        count += len(batch)
+        total += sum(batch)
+    if not count:
+        out.write("(none)\n")
+    out.write(f"\nTotal Invalid Count: {count}\n")
+    out.write(f"Sum of Invalid Numbers: {total}\n")
+
+
+def _write_summary(title: str, result: RuleResult, out: TextIO):
+    out.write(f"\n=== {title} ===\n")
+    out.write(f"Total Invalid Count: {result.count}\n")
+    out.write(f"Sum of Invalid Numbers: {result.total}\n")
 
 
 def main():
     parser = argparse.ArgumentParser(description="Run part A and part B for day 2")
     parser.add_argument("input", nargs="?", default="aoc2i.txt", help="input file path")
+    parser.add_argument("--unique", action="store_true",
+                        help="report each ID once even if several ranges cover it")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="worker processes for scanning ranges (with --summary-only)")
+    parser.add_argument("--summary-only", action="store_true",
+                        help="print only the count and sum of invalid numbers")
+    parser.add_argument("--out", help="write the report to this file instead of stdout")
     args = parser.parse_args()
+    if args.workers != 1 and not args.summary_only:
+        parser.error("--workers requires --summary-only")
 
     with open(args.input, "r", encoding="utf-8") as f:
         raw_lines = f.readlines()
 
-    invalids_a = parta(raw_lines)
-    invalids_b = partb(raw_lines)
-
-    _print_results("Part A - Exact Two-Block Repeats", invalids_a)
-    _print_results("Part B - Repeated Pattern", invalids_b)
+    out = open(args.out, "w", encoding="utf-8", buffering=1 << 20) if args.out else sys.stdout
+    try:
+        if args.summary_only:
+            results = scan(raw_lines, ["two-block", "repeat"], unique=args.unique, workers=args.workers)
+            _write_summary("Part A - Exact Two-Block Repeats", results["two-block"], out)
+            _write_summary("Part B - Repeated Pattern", results["repeat"], out)
+        else:
+            # Normalize once and list both rules from the same segments.
+            segments = normalize_ranges(raw_lines, args.unique)
+            _write_results("Part A - Exact Two-Block Repeats", _iter_segment_invalids(segments, two_block_periods), out)
+            _write_results("Part B - Repeated Pattern", _iter_segment_invalids(segments, repeat_periods), out)
+    finally:
+        if out is not sys.stdout:
+            out.close()
 
 
 if __name__ == "__main__":
@@ -1,27 +1,37 @@
 """Day 3 merged runner.
 
-Provides `parta(lines)`, `partb(lines, k=12)` and a `main()` that reads
-an input file once and prints both results.
+Provides `parta(lines)` (with a vectorized `parta_numpy(lines)`),
+`partb(lines, k=12)` (which also accepts several k values at once),
+`solve_mmap(path)` which scans a memory-mapped input as raw bytes across
+worker processes, and a `main()` that reads an input file once and
+prints both results.
 """
 
-from typing import Iterable, List
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterable, List, Sequence, Tuple, Union
 import argparse
+import mmap
+import os
 
+import numpy as np
 
-def max_joltage(line: str) -> int:
-    digits = list(map(int, line.strip()))
-    best = -1
 
-    for i in range(len(digits)):
-        d1 = digits[i]
-        if i == len(digits) - 1:
-            continue
+def max_joltage(line: str) -> int:
+    """Best two-digit number d1d2 with d1 before d2, or -1 for a single digit.
 
-        d2 = max(digits[i + 1 :])
-        joltage = d1 * 10 + d2
+    Scans right to left keeping the running maximum of the digits seen so
+    far, which is the best d2 for every d1 to its left.
+    """
+    best = -1
+    suffix_max = -1
 
-        if joltage > best:
-            best = joltage
+    for d in reversed(list(map(int, line.strip()))):
+        if suffix_max >= 0:
+            joltage = d * 10 + suffix_max
+            if joltage > best:
+                best = joltage
+        if d > suffix_max:
+            suffix_max = d
 
     return best
 
@@ -41,6 +51,41 @@ def max_k_subsequence(s: str, k: int) -> str:
     return "".join(stack[:k])
 
 
+def next_occurrence(s: str) -> List[List[int]]:
+    """Return `table[d][i]`: first index j >= i with digit d in `s`, else len(s)."""
+    n = len(s)
+    table = []
+    for d in "0123456789":
+        row = [n] * (n + 1)
+        nxt = n
+        for i in range(n - 1, -1, -1):
+            if s[i] == d:
+                nxt = i
+            row[i] = nxt
+        table.append(row)
+    return table
+
+
+def best_k_from_table(table: List[List[int]], k: int) -> int:
+    """Largest k-digit subsequence value using a `next_occurrence` table.
+
+    Each output digit is the largest d whose next occurrence still leaves
+    enough digits for the rest, so a query costs O(k * 10).
+    """
+    n = len(table[0]) - 1
+    pos = 0
+    value = 0
+    for remaining in range(min(k, n), 0, -1):
+        limit = n - remaining
+        for d in range(9, -1, -1):
+            j = table[d][pos]
+            if j <= limit:
+                value = value * 10 + d
+                pos = j + 1
+                break
+    return value
+
+
 def parta(lines: Iterable[str]) -> int:
     """Compute the total 'joltage' as in the original `aoc3.py`.
 
@@ -56,36 +101,184 @@ def parta(lines: Iterable[str]) -> int:
     return total
 
 
-def partb(lines: Iterable[str], k: int = 12) -> int:
-    """Compute the total using the largest k-digit subsequence per line.
+def parta_numpy(lines: Iterable[str]) -> int:
+    """Vectorized `parta`: lines of equal length form one uint8 digit matrix.
 
-    Returns the integer total (sum of int(max_k_subsequence(...))).
+    The reverse running maximum of each row (`np.maximum.accumulate` over
+    the flipped matrix) gives the best second digit for every position,
+    so all line maxima of a group come out of a few array operations.
     """
+    groups: Dict[int, List[str]] = {}
+    for line in lines:
+        s = line.strip()
+        if s:
+            groups.setdefault(len(s), []).append(s)
+
     total = 0
+    for width, group in groups.items():
+        if width == 1:
+            total -= len(group)  # max_joltage has no pair to form
+            continue
+        digits = np.frombuffer("".join(group).encode("ascii"), dtype=np.uint8).reshape(len(group), width) - 48
+        suffix_max = np.maximum.accumulate(digits[:, ::-1], axis=1)[:, ::-1]
+        joltage = digits[:, :-1].astype(np.int32) * 10 + suffix_max[:, 1:]
+        total += int(joltage.max(axis=1).sum())
+    return total
+
+
+def partb(lines: Iterable[str], k: Union[int, Sequence[int]] = 12) -> Union[int, Dict[int, int]]:
+    """Compute the total using the largest k-digit subsequence per line.
+
+    With a single `k` returns the integer total (sum of
+    int(max_k_subsequence(...))). With a sequence of k values every line
+    is indexed once by `next_occurrence` and a {k: total} table is
+    returned.
+    """
+    if isinstance(k, int):
+        total = 0
+        for line in lines:
+            seq = line.strip()
+            if not seq:
+                continue
+            best = int(max_k_subsequence(seq, k))
+            total += best
+        return total
+
+    totals = dict.fromkeys(k, 0)
     for line in lines:
         seq = line.strip()
         if not seq:
             continue
-        best = int(max_k_subsequence(seq, k))
-        total += best
-    return total
+        table = next_occurrence(seq)
+        for kk in totals:
+            totals[kk] += best_k_from_table(table, kk)
+    return totals
+
+
+def _joltage_bytes(line: bytes) -> int:
+    """`max_joltage` on raw ASCII digits; byte order matches digit order."""
+    best = -1
+    suffix_max = -1
+    for b in reversed(line):
+        if suffix_max >= 0:
+            joltage = (b - 48) * 10 + suffix_max
+            if joltage > best:
+                best = joltage
+        if b - 48 > suffix_max:
+            suffix_max = b - 48
+    return best
+
+
+def _best_k_bytes(line: bytes, k: int) -> int:
+    """`int(max_k_subsequence(...))` on raw ASCII digits."""
+    stack = bytearray()
+    to_remove = len(line) - k
+    for b in line:
+        while stack and to_remove > 0 and stack[-1] < b:
+            stack.pop()
+            to_remove -= 1
+        stack.append(b)
+    value = 0
+    for b in stack[:k]:
+        value = value * 10 + b - 48
+    return value
+
+
+def _chunk_totals(path: str, start: int, end: int, ks: Sequence[int]) -> Tuple[int, List[int]]:
+    """Part A total and part B totals (one per k) for lines in [start, end)."""
+    total_a = 0
+    totals_b = [0] * len(ks)
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        pos = start
+        while pos < end:
+            nl = mm.find(b"\n", pos, end)
+            if nl < 0:
+                nl = end
+            line = mm[pos:nl].strip()
+            pos = nl + 1
+            if not line:
+                continue
+            total_a += _joltage_bytes(line)
+            for i, k in enumerate(ks):
+                totals_b[i] += _best_k_bytes(line, k)
+    return total_a, totals_b
+
+
+def solve_mmap(path: str, ks: Sequence[int] = (12,), workers: int = 1) -> Tuple[int, Dict[int, int]]:
+    """Memory-map `path` and return (part A total, {k: part B total}).
+
+    Lines are read as bytes straight from the mapping. The file is cut
+    into `workers` line-aligned chunks, each scanned by a pool process
+    that maps the file itself, and the per-chunk totals are summed.
+    """
+    ks = list(ks)
+    size = os.path.getsize(path)
+    if size == 0:
+        return 0, dict.fromkeys(ks, 0)
+
+    bounds = [0]
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        for i in range(1, max(workers, 1)):
+            nl = mm.find(b"\n", max(size * i // workers, bounds[-1]))
+            if nl < 0:
+                break
+            bounds.append(nl + 1)
+    bounds.append(size)
+    spans = list(zip(bounds, bounds[1:]))
+
+    if len(spans) == 1:
+        parts = [_chunk_totals(path, spans[0][0], spans[0][1], ks)]
+    else:
+        with ProcessPoolExecutor(max_workers=len(spans)) as pool:
+            parts = list(pool.map(
+                _chunk_totals,
+                [path] * len(spans),
+                [lo for lo, _ in spans],
+                [hi for _, hi in spans],
+                [ks] * len(spans),
+            ))
+
+    total_a = sum(a for a, _ in parts)
+    totals_b = {k: sum(b[i] for _, b in parts) for i, k in enumerate(ks)}
+    return total_a, totals_b
+
+
+def _k_values(text: str) -> List[int]:
+    """Parse a --k argument: a single value or an inclusive 'lo-hi' range."""
+    if "-" in text:
+        lo, hi = map(int, text.split("-", 1))
+        return list(range(lo, hi + 1))
+    return [int(text)]
 
 
 def main():
     parser = argparse.ArgumentParser(description="Run part A and part B for day 3")
     parser.add_argument("input", nargs="?", default="day3input.txt", help="input file path")
-    parser.add_argument("--k", type=int, default=12, help="subsequence length for part B")
+    parser.add_argument("--k", type=_k_values, nargs="+", default=[[12]],
+                        help="subsequence length(s) for part B, e.g. 12 or 1-20")
+    parser.add_argument("--numpy", action="store_true", help="use the vectorized part A engine")
+    parser.add_argument("--mmap", action="store_true", help="memory-map the input and scan it as bytes")
+    parser.add_argument("--workers", type=int, default=1, help="worker processes for --mmap")
     args = parser.parse_args()
 
-    # Read file once
-    with open(args.input, "r") as f:
-        raw_lines = f.readlines()
+    ks = [k for group in args.k for k in group]
+
+    if args.mmap:
+        a, totals = solve_mmap(args.input, ks, args.workers)
+    else:
+        # Read file once
+        with open(args.input, "r") as f:
+            raw_lines = f.readlines()
 
-    a = parta(raw_lines)
-    b = partb(raw_lines, k=args.k)
+        a = parta_numpy(raw_lines) if args.numpy else parta(raw_lines)
+        if len(ks) == 1:
+            totals = {ks[0]: partb(raw_lines, k=ks[0])}
+        else:
+            totals = partb(raw_lines, k=ks)
 
     print("Part A Total Joltage:", a)
-    print("Part B Total (k={}) :".format(args.k), b)
+    for k, total in totals.items():
+        print("Part B Total (k={}) :".format(k), total)
 
 
 if __name__ == "__main__":
@@ -1,116 +1,495 @@
 """Day 4 merged runner.
 
-Provides `parta(lines)` which counts accessible rolls and
-`partb(lines)` which simulates removals and returns total removed.
-`main()` reads the input file once and prints both results.
+Provides `parta(grid)` which counts accessible rolls and
+`partb(grid)` which simulates removals and returns total removed. The
+input is parsed once into a compact bytearray-backed `Grid` shared by
+both parts (plain input lines are accepted too). Both run on a
+selectable backend: "python" (per-cell counts and a removal worklist),
+"numpy" (shifted-slice neighbour sums) or "bitboard" (the grid as one
+big int with bit-sliced neighbour counters).
+`removal_waves(grid)` also reports the round in which each roll goes,
+and `write_depth_map` stores that grid compactly. `solve_tiled(path)`
+runs both parts on a memory-mapped grid split into row bands across
+worker processes. `main()` reads the input file once and prints both
+results.
 """
-from typing import Iterable, List
+from array import array
+from typing import Callable, Dict, Iterable, List, NamedTuple, Optional, Tuple, Union
 import argparse
-import copy
+import mmap
+import multiprocessing
+import os
+import struct
+import sys
 
+try:
+    import numpy as np
+except ImportError:  # the bitboard and python backends need only the stdlib
+    np = None
 
-def count_accessible_rolls(grid: List[str]) -> int:
-    rows = len(grid)
-    cols = len(grid[0]) if rows else 0
+
+_ROLL_BYTES = bytes(1 if b == ord('@') else 0 for b in range(256))
+
+
+class Grid:
+    """Rolls as a flat bytearray (1 = roll) with a one-cell empty border.
+
+    Cell (r, c) lives at `(r + 1) * stride + c + 1`, so every cell of the
+    grid has all 8 neighbours in the buffer and no bounds checks are
+    needed. One byte per cell; `copy()` duplicates just the buffer.
+    """
+
+    __slots__ = ("rows", "cols", "stride", "cells")
+
+    def __init__(self, rows: int, cols: int, cells: bytearray):
+        self.rows = rows
+        self.cols = cols
+        self.stride = cols + 2
+        self.cells = cells
+
+    @classmethod
+    def from_lines(cls, lines: Iterable[str]) -> "Grid":
+        raw = [line.rstrip("\n") for line in lines if line.strip() != ""]
+        rows, cols = len(raw), len(raw[0]) if raw else 0
+        stride = cols + 2
+        cells = bytearray(stride * (rows + 2))
+        for r, row in enumerate(raw):
+            base = (r + 1) * stride + 1
+            cells[base:base + cols] = row.encode("ascii")[:cols].ljust(cols, b".").translate(_ROLL_BYTES)
+        return cls(rows, cols, cells)
+
+    def copy(self) -> "Grid":
+        return Grid(self.rows, self.cols, bytearray(self.cells))
+
+    @property
+    def offsets(self) -> Tuple[int, ...]:
+        """Index offsets of the 8 neighbours of a cell."""
+        stride = self.stride
+        return (
+            -stride - 1, -stride, -stride + 1,
+            -1,                   1,
+            stride - 1,  stride,  stride + 1,
+        )
+
+    def row(self, r: int) -> bytearray:
+        """Cells of grid row `r` without the border."""
+        base = (r + 1) * self.stride + 1
+        return self.cells[base:base + self.cols]
+
+
+def count_accessible_rolls(grid: Grid) -> int:
+    cells = grid.cells
+    offsets = grid.offsets
     accessible = 0
+    for i, cell in enumerate(cells):
+        if cell and sum(cells[i + o] for o in offsets) < 4:
+            accessible += 1
+    return accessible
+
+
+# The largest value of each depth typecode marks a roll that is never removed.
+_DEPTH_LIMITS = {"B": 0xFF, "H": 0xFFFF, "I": 0xFFFFFFFF}
+# magic, rows, cols, typecode; the typecode also fixes the survivor value
+_DEPTH_HEADER = struct.Struct("<4sIIc")
+
+
+class RemovalWaves(NamedTuple):
+    total: int
+    # histogram[w - 1] rolls were removed in round w
+    histogram: List[int]
+    # depth[r * cols + c]: round in which the roll was removed, 0 for an
+    # empty cell, _DEPTH_LIMITS[depth.typecode] for a roll that survives;
+    # None unless requested
+    depth: Optional[array]
+    rows: int
+    cols: int
 
-    # 8 neighbor directions
-    dirs = [
-        (-1, -1), (-1, 0), (-1, 1),
-        (0, -1),          (0, 1),
-        (1, -1),  (1, 0), (1, 1)
-    ]
 
+def removal_waves(grid: Grid, depth: bool = True) -> RemovalWaves:
+    """Remove rolls with fewer than 4 roll neighbours until none remain.
+
+    Equivalent to rescanning the grid each round and removing every such
+    roll simultaneously, but neighbour counts are computed once and then
+    only decremented. A roll can only become removable when a neighbour
+    disappears, so each round's candidates are exactly the rolls whose
+    count drops to 3 during the previous round. The round of every
+    removal is recorded as it happens if `depth` is set, and rolls still
+    standing at the end keep the typecode's largest value; otherwise
+    only the histogram is kept. Removed rolls are cleared from `grid`.
+    """
+    rows, cols, stride = grid.rows, grid.cols, grid.stride
+    cells = grid.cells
+    offsets = grid.offsets
+    counts = bytearray(len(cells))
+    depth_map = array("B", bytes(rows * cols)) if depth else None
+    survivor = _DEPTH_LIMITS["B"]
+    wave: List[int] = []
     for r in range(rows):
-        for c in range(cols):
-            if grid[r][c] != '@':
-                continue
+        base = (r + 1) * stride + 1
+        for c, cell in enumerate(cells[base:base + cols]):
+            if cell:
+                i = base + c
+                counts[i] = n = sum(cells[i + o] for o in offsets)
+                if n < 4:
+                    wave.append(i)
+                if depth_map is not None:
+                    depth_map[r * cols + c] = survivor
 
-            neighbor_count = 0
+    histogram: List[int] = []
+    while wave:
+        round_no = len(histogram) + 1
+        # Remove simultaneously
+        if depth_map is None:
+            for i in wave:
+                cells[i] = 0
+        else:
+            if round_no >= survivor:
+                typecode = "H" if depth_map.typecode == "B" else "I"
+                widened = _DEPTH_LIMITS[typecode]
+                depth_map = array(typecode, (widened if d == survivor else d for d in depth_map))
+                survivor = widened
+            for i in wave:
+                cells[i] = 0
+                r, c = divmod(i, stride)
+                depth_map[(r - 1) * cols + c - 1] = round_no
+        histogram.append(len(wave))
 
-            for dr, dc in dirs:
-                nr, nc = r + dr, c + dc
-                if 0 <= nr < rows and 0 <= nc < cols:
-                    if grid[nr][nc] == '@':
-                        neighbor_count += 1
+        next_wave: List[int] = []
+        for i in wave:
+            for o in offsets:
+                j = i + o
+                if cells[j]:
+                    counts[j] -= 1
+                    if counts[j] == 3:
+                        next_wave.append(j)
+        wave = next_wave
 
-            if neighbor_count < 4:
-                accessible += 1
+    return RemovalWaves(sum(histogram), histogram, depth_map, rows, cols)
 
-    return accessible
+
+def simulate_removal(grid: Grid) -> int:
+    """Simulate removals on `grid` in place and return the total removed."""
+    return removal_waves(grid, depth=False).total
+
+
+def write_depth_map(path: str, waves: RemovalWaves) -> None:
+    """Write the depth grid as a small header plus little-endian cells.
+
+    The header holds a magic tag, rows, cols and the array typecode; the
+    cell width is the narrowest that fits the last round. Cells are 0 for
+    empty, the removal round, or the typecode's largest value (0xFF,
+    0xFFFF or 0xFFFFFFFF) for a roll that is never removed. `waves` must
+    come from `removal_waves(grid, depth=True)`.
+    """
+    depth = waves.depth
+    if sys.byteorder != "little" and depth.itemsize > 1:
+        depth = array(depth.typecode, depth)
+        depth.byteswap()
+    with open(path, "wb") as f:
+        f.write(_DEPTH_HEADER.pack(b"AOC4", waves.rows, waves.cols, depth.typecode.encode("ascii")))
+        depth.tofile(f)
+
+
+def read_depth_map(path: str) -> Tuple[int, int, array]:
+    """Return (rows, cols, depth) from a file written by `write_depth_map`."""
+    with open(path, "rb") as f:
+        magic, rows, cols, typecode = _DEPTH_HEADER.unpack(f.read(_DEPTH_HEADER.size))
+        if magic != b"AOC4":
+            raise ValueError(f"{path} is not a depth map")
+        depth = array(typecode.decode("ascii"))
+        depth.fromfile(f, rows * cols)
+    if sys.byteorder != "little" and depth.itemsize > 1:
+        depth.byteswap()
+    return rows, cols, depth
 
 
-def count_neighbors(grid: List[List[str]], r: int, c: int) -> int:
-    dirs = [
-        (-1, -1), (-1, 0), (-1, 1),
-        (0, -1),          (0, 1),
-        (1, -1),  (1, 0), (1, 1)
-    ]
-    rows, cols = len(grid), len(grid[0]) if grid else 0
-    count = 0
-    for dr, dc in dirs:
-        nr, nc = r + dr, c + dc
-        if 0 <= nr < rows and 0 <= nc < cols:
-            if grid[nr][nc] == '@':
-                count += 1
-    return count
-
-
-def simulate_removal(grid: List[List[str]]) -> int:
-    rows, cols = len(grid), len(grid[0]) if grid else 0
+def _numpy_board(grid: Grid) -> "np.ndarray":
+    """Boolean roll array including the grid's empty border."""
+    cells = np.frombuffer(grid.cells, dtype=np.uint8).reshape(grid.rows + 2, grid.stride)
+    return cells.astype(bool)
+
+
+def _numpy_neighbors(board: "np.ndarray") -> "np.ndarray":
+    """8-neighbour roll counts for the interior: a 3x3 box sum minus the centre."""
+    rows, cols = board.shape[0] - 2, board.shape[1] - 2
+    counts = np.zeros((rows, cols), dtype=np.uint8)
+    for dr in range(3):
+        for dc in range(3):
+            if dr != 1 or dc != 1:
+                counts += board[dr:dr + rows, dc:dc + cols]
+    return counts
+
+
+def count_accessible_numpy(grid: Grid) -> int:
+    board = _numpy_board(grid)
+    return int(np.count_nonzero(board[1:-1, 1:-1] & (_numpy_neighbors(board) < 4)))
+
+
+def simulate_removal_numpy(grid: Grid) -> int:
+    board = _numpy_board(grid)
+    inner = board[1:-1, 1:-1]  # view: clearing it updates the board
     total_removed = 0
+    while True:
+        removable = inner & (_numpy_neighbors(board) < 4)
+        removed = int(np.count_nonzero(removable))
+        if not removed:
+            break
+        inner[removable] = False
+        total_removed += removed
+    return total_removed
+
+
+_BIT_CHARS = bytes.maketrans(b"\x00\x01", b"01")
+
+
+def _bitboard(grid: Grid) -> Tuple[int, int, int]:
+    """Return (board, mask, stride) with bit r * stride + c set for a roll.
+
+    Each row is followed by one always-clear guard bit so that shifting by
+    one column never carries a roll into the neighbouring row.
+    """
+    cols = grid.cols
+    stride = cols + 1
+    if not cols or not grid.rows:
+        return 0, 0, stride
+    bits = b"".join(grid.row(r).translate(_BIT_CHARS) + b"0" for r in range(grid.rows))
+    board = int(bits[::-1], 2)
+    mask = int(("0" + "1" * cols) * grid.rows, 2)
+    return board, mask, stride
+
+
+def _bitboard_crowded(board: int, mask: int, stride: int) -> int:
+    """Bits of cells with at least 4 roll neighbours (bit-sliced counter)."""
+    ones = twos = fours = 0
+    for shift in (1, stride - 1, stride, stride + 1):
+        for x in ((board << shift) & mask, board >> shift):
+            carry = ones & x
+            ones ^= x
+            fours |= twos & carry
+            twos ^= carry
+    return fours
+
 
+def count_accessible_bitboard(grid: Grid) -> int:
+    board, mask, stride = _bitboard(grid)
+    return (board & ~_bitboard_crowded(board, mask, stride)).bit_count()
+
+
+def simulate_removal_bitboard(grid: Grid) -> int:
+    board, mask, stride = _bitboard(grid)
+    total_removed = 0
     while True:
-        to_remove: List[tuple[int, int]] = []
+        removable = board & ~_bitboard_crowded(board, mask, stride)
+        if not removable:
+            break
+        board &= ~removable
+        total_removed += removable.bit_count()
+    return total_removed
+
+
+# backend name -> (part A counter, part B simulator); simulators may clear the grid
+BACKENDS: Dict[str, Tuple[Callable[[Grid], int], Callable[[Grid], int]]] = {
+    "python": (count_accessible_rolls, simulate_removal),
+    "bitboard": (count_accessible_bitboard, simulate_removal_bitboard),
+}
+if np is not None:
+    BACKENDS["numpy"] = (count_accessible_numpy, simulate_removal_numpy)
+
 
-        # Identify removable rolls
-        for r in range(rows):
-            for c in range(cols):
-                if grid[r][c] == '@':
-                    if count_neighbors(grid, r, c) < 4:
-                        to_remove.append((r, c))
+def parta(grid: Union[Grid, Iterable[str]], backend: str = "python") -> int:
+    """Return the count of accessible rolls (from a Grid or input lines)."""
+    if not isinstance(grid, Grid):
+        grid = Grid.from_lines(grid)
+    return BACKENDS[backend][0](grid)
 
-        # If nothing to remove, we're done
-        if not to_remove:
+
+def partb(grid: Union[Grid, Iterable[str]], backend: str = "python") -> int:
+    """Simulate removals and return total removed; `grid` is left untouched."""
+    grid = grid.copy() if isinstance(grid, Grid) else Grid.from_lines(grid)
+    return BACKENDS[backend][1](grid)
+
+
+def _grid_rows(mm: mmap.mmap) -> List[Tuple[int, int]]:
+    """Return (offset, length) of every non-blank row of a mapped grid file.
+
+    A trailing "\r" is not part of the row, and blank lines are skipped as
+    in `Grid.from_lines`.
+    """
+    spans = []
+    pos = 0
+    size = len(mm)
+    while pos < size:
+        nl = mm.find(b"\n", pos)
+        end = size if nl < 0 else nl
+        length = end - pos
+        if length and mm[end - 1:end] == b"\r":
+            length -= 1
+        if mm[pos:pos + length].strip():
+            spans.append((pos, length))
+        pos = end + 1
+    return spans
+
+
+def _band_worker(path: str, lo: int, hi: int, cols: int, spans: List[Tuple[int, int]], conn) -> None:
+    """Own grid rows [lo, hi) plus one halo row on each side.
+
+    `spans` holds the (offset, length) of grid rows max(lo - 1, 0) up to
+    the halo row below the band, as returned by `_grid_rows`.
+
+    Each round the parent sends the columns removed last round in the
+    rows just outside the band; the worker applies them, removes its
+    current wave, and replies with the removal count and the columns
+    removed in its own first and last rows.
+    """
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        stride = cols + 2
+        height = hi - lo + 2  # local row k is grid row lo - 1 + k
+        cells = bytearray(stride * height)
+        for g, (offset, length) in enumerate(spans, max(lo - 1, 0)):
+            k = g - lo + 1
+            row = mm[offset:offset + min(length, cols)].ljust(cols, b".")
+            cells[k * stride + 1:k * stride + 1 + cols] = row.translate(_ROLL_BYTES)
+
+    offsets = Grid(height - 2, cols, cells).offsets
+    first, last = stride, stride * (height - 1)  # band cell index range
+    counts = bytearray(len(cells))
+    wave: List[int] = []
+    for i in range(first, last):
+        if cells[i]:
+            counts[i] = n = sum(cells[i + o] for o in offsets)
+            if n < 4:
+                wave.append(i)
+
+    def clear_halo(row_start: int, inward: int, removed_cols: List[int]) -> None:
+        for c in removed_cols:
+            i = row_start + c + 1
+            cells[i] = 0
+            for j in (i + inward - 1, i + inward, i + inward + 1):
+                if cells[j]:
+                    counts[j] -= 1
+                    if counts[j] == 3:
+                        wave.append(j)
+
+    while True:
+        message = conn.recv()
+        if message is None:
             break
+        top_removed, bottom_removed = message
+        clear_halo(0, stride, top_removed)
+        clear_halo(last, -stride, bottom_removed)
 
-        # Remove simultaneously
-        for r, c in to_remove:
-            grid[r][c] = '.'
+        for i in wave:
+            cells[i] = 0
+        edge_top = [i - first - 1 for i in wave if i < first + stride]
+        edge_bottom = [i - last + stride - 1 for i in wave if i >= last - stride]
 
-        total_removed += len(to_remove)
+        next_wave: List[int] = []
+        for i in wave:
+            for o in offsets:
+                j = i + o
+                if cells[j] and first <= j < last:
+                    counts[j] -= 1
+                    if counts[j] == 3:
+                        next_wave.append(j)
+        conn.send((len(wave), edge_top, edge_bottom))
+        wave = next_wave
+    conn.close()
 
-    return total_removed
 
+def solve_tiled(path: str, workers: int = 1) -> Tuple[int, int]:
+    """Return (part A, part B) for a grid file split into row bands.
 
-def parta(lines: Iterable[str]) -> int:
-    """Return the count of accessible rolls from the input lines."""
-    grid = [line.rstrip("\n") for line in lines if line.strip() != ""]
-    return count_accessible_rolls(grid)
+    Every worker process maps the file and keeps only its band plus a
+    one-row halo. Rounds run in lockstep: after each round the parent
+    forwards every band's edge-row removals to the neighbouring bands as
+    halo updates, and stops at the first round in which nothing is
+    removed anywhere. Rounds match the single-process simulation exactly,
+    so round 1 is part A and the sum over all rounds is part B.
+    """
+    with open(path, "rb") as f:
+        if not os.fstat(f.fileno()).st_size:
+            return 0, 0
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            spans = _grid_rows(mm)
+    rows = len(spans)
+    if not rows:
+        return 0, 0
+    cols = spans[0][1]
+    bands = max(1, min(workers, rows))
+    bounds = [rows * i // bands for i in range(bands + 1)]
 
+    conns = []
+    procs = []
+    for lo, hi in zip(bounds, bounds[1:]):
+        parent_end, child_end = multiprocessing.Pipe()
+        halo = spans[max(lo - 1, 0):hi + 1]
+        proc = multiprocessing.Process(target=_band_worker, args=(path, lo, hi, cols, halo, child_end))
+        proc.start()
+        child_end.close()
+        conns.append(parent_end)
+        procs.append(proc)
 
-def partb(lines: Iterable[str]) -> int:
-    """Simulate removals and return total removed."""
-    raw = [line.rstrip("\n") for line in lines if line.strip() != ""]
-    grid = [list(row) for row in raw]
-    # operate on a copy to avoid mutating input
-    grid_copy = copy.deepcopy(grid)
-    return simulate_removal(grid_copy)
+    histogram: List[int] = []
+    edges = [([], [])] * bands
+    try:
+        while True:
+            for w, conn in enumerate(conns):
+                above = edges[w - 1][1] if w > 0 else []
+                below = edges[w + 1][0] if w + 1 < bands else []
+                conn.send((above, below))
+            replies = [conn.recv() for conn in conns]
+            removed = sum(n for n, _, _ in replies)
+            if not removed:
+                break
+            histogram.append(removed)
+            edges = [(top, bottom) for _, top, bottom in replies]
+    finally:
+        for conn in conns:
+            conn.send(None)
+            conn.close()
+        for proc in procs:
+            proc.join()
+
+    return (histogram[0] if histogram else 0), sum(histogram)
 
 
 def main():
     parser = argparse.ArgumentParser(description="Run part A and part B for day 4")
     parser.add_argument("input", nargs="?", default="aoc4i.txt", help="input file path")
+    parser.add_argument("--backend", choices=sorted(BACKENDS), default="python",
+                        help="grid engine to use")
+    parser.add_argument("--waves", action="store_true", help="print rolls removed per round")
+    parser.add_argument("--depth-out", help="write the per-cell removal round to this binary file (0 empty, type max = never removed)")
+    parser.add_argument("--tiled", action="store_true",
+                        help="memory-map the grid and split it into row bands across processes")
+    parser.add_argument("--workers", type=int, default=1, help="row bands / processes for --tiled")
     args = parser.parse_args()
+    if (args.waves or args.depth_out) and (args.tiled or args.backend != "python"):
+        parser.error("--waves and --depth-out need the python backend without --tiled")
+
+    if args.tiled:
+        a, b = solve_tiled(args.input, args.workers)
+        print("Part A Accessible rolls:", a)
+        print("Part B Total rolls removed:", b)
+        return
 
     with open(args.input, "r", encoding="utf-8") as f:
-        raw_lines = f.readlines()
+        grid = Grid.from_lines(f)
 
-    a = parta(raw_lines)
-    b = partb(raw_lines)
+    a = parta(grid, args.backend)
+    if args.waves or args.depth_out:
+        waves = removal_waves(grid.copy(), depth=bool(args.depth_out))
+        b = waves.total
+    else:
+        b = partb(grid, args.backend)
 
     print("Part A Accessible rolls:", a)
     print("Part B Total rolls removed:", b)
+    if args.waves:
+        for round_no, removed in enumerate(waves.histogram, 1):
+            print(f"Round {round_no}: {removed}")
+    if args.depth_out:
+        write_depth_map(args.depth_out, waves)
 
 
 if __name__ == "__main__":
@@ -2,10 +2,23 @@
 
 Provides `parta(content)` which counts fresh IDs matching ranges and
 `partb(content)` which counts unique fresh IDs by merging overlapping ranges.
-`main()` reads the input file once and prints both results.
+`solve_numpy(path)` gives both answers while streaming the ID section in
+fixed-size batches classified with `np.searchsorted`, and
+`solve_indexed(path, index_dir)` additionally reuses a memory-mapped
+merged-range index cached on disk. `IntervalSet` keeps the merged
+ranges and the unique fresh count up to date under incremental inserts
+and deletes. `main()` reads the input file once and prints both
+results.
 """
-from typing import List, Tuple
+from bisect import bisect_left, bisect_right
+from typing import BinaryIO, Iterable, Iterator, List, Tuple
 import argparse
+import hashlib
+import mmap
+import os
+import struct
+
+import numpy as np
 
 
 def parse_ranges_and_ids(content: str) -> Tuple[List[Tuple[int, int]], List[int]]:
@@ -26,28 +39,13 @@ def parse_ranges_and_ids(content: str) -> Tuple[List[Tuple[int, int]], List[int]
     return ranges, ids
 
 
-def parta(content: str) -> int:
-    """Count fresh IDs that fall within at least one range."""
-    ranges, ids = parse_ranges_and_ids(content)
-
-    def is_fresh(id_val: int) -> bool:
-        for start, end in ranges:
-            if start <= id_val <= end:
-                return True
-        return False
-
-    return sum(1 for id_val in ids if is_fresh(id_val))
-
-
-def partb(content: str) -> int:
-    """Count unique fresh IDs by merging overlapping ranges."""
-    ranges, _ = parse_ranges_and_ids(content)
-
+def merge_ranges(ranges: List[Tuple[int, int]]) -> List[Tuple[int, int]]:
+    """Sort ranges and merge overlapping or touching ones into disjoint ranges."""
     if not ranges:
-        return 0
+        return []
 
     # Sort ranges by start
-    ranges.sort()
+    ranges = sorted(ranges)
 
     # Merge overlapping ranges
     merged: List[Tuple[int, int]] = []
@@ -61,23 +59,295 @@ def partb(content: str) -> int:
             curr_start, curr_end = start, end
 
     merged.append((curr_start, curr_end))
+    return merged
+
+
+def parta(content: str) -> int:
+    """Count fresh IDs that fall within at least one range.
+
+    Ranges are merged into a disjoint, sorted index once; each ID is then
+    located with a binary search over the range starts.
+    """
+    ranges, ids = parse_ranges_and_ids(content)
+    merged = merge_ranges(ranges)
+    starts = [start for start, _ in merged]
+
+    def is_fresh(id_val: int) -> bool:
+        k = bisect_right(starts, id_val) - 1
+        return k >= 0 and id_val <= merged[k][1]
+
+    return sum(1 for id_val in ids if is_fresh(id_val))
+
+
+def partb(content: str) -> int:
+    """Count unique fresh IDs by merging overlapping ranges."""
+    ranges, _ = parse_ranges_and_ids(content)
 
     # Count unique fresh IDs
-    total_fresh = sum((end - start + 1) for start, end in merged)
+    total_fresh = sum((end - start + 1) for start, end in merge_ranges(ranges))
 
     return total_fresh
 
 
+def read_ranges(stream: BinaryIO) -> List[Tuple[int, int]]:
+    """Read 'start-end' lines from `stream` up to the blank separator line."""
+    ranges = []
+    for line in stream:
+        if not line.strip():
+            break
+        start, end = map(int, line.split(b'-'))
+        ranges.append((start, end))
+    return ranges
+
+
+def iter_id_batches(stream: BinaryIO, batch_size: int = 1 << 20) -> Iterator[np.ndarray]:
+    """Yield the remaining IDs of `stream` as int64 arrays, `batch_size` bytes at a time.
+
+    Each batch is cut after its last newline and parsed in one
+    `np.fromstring` call; the partial line is carried into the next read.
+    """
+    if batch_size <= 0:
+        raise ValueError("batch_size must be positive")
+    tail = b""
+    while True:
+        chunk = stream.read(batch_size)
+        if not chunk:
+            break
+        data = tail + chunk
+        cut = data.rfind(b"\n") + 1
+        tail = data[cut:]
+        # np.fromstring turns whitespace-only text into [0], a phantom ID 0
+        if data[:cut].strip():
+            yield np.fromstring(data[:cut].decode("ascii"), dtype=np.int64, sep=" ")
+    if tail.strip():
+        yield np.fromstring(tail.decode("ascii"), dtype=np.int64, sep=" ")
+
+
+def interval_arrays(merged: List[Tuple[int, int]]) -> Tuple[np.ndarray, np.ndarray]:
+    """Split disjoint sorted ranges into int64 start and end arrays."""
+    starts = np.fromiter((start for start, _ in merged), dtype=np.int64, count=len(merged))
+    ends = np.fromiter((end for _, end in merged), dtype=np.int64, count=len(merged))
+    return starts, ends
+
+
+def count_fresh_numpy(starts: np.ndarray, ends: np.ndarray, ids: np.ndarray) -> int:
+    """Count `ids` inside the disjoint sorted ranges [starts[i], ends[i]]."""
+    if not starts.size or not ids.size:
+        return 0
+    k = np.searchsorted(starts, ids, side="right") - 1
+    fresh = (k >= 0) & (ids <= ends[np.maximum(k, 0)])
+    return int(np.count_nonzero(fresh))
+
+
+def solve_numpy(path: str, batch_size: int = 1 << 20) -> Tuple[int, int]:
+    """Return (part A, part B) classifying the ID section in bounded-size batches.
+
+    Only the range list and one batch of IDs are held in memory at a time.
+    """
+    with open(path, "rb") as f:
+        merged = merge_ranges(read_ranges(f))
+        starts, ends = interval_arrays(merged)
+        fresh = sum(count_fresh_numpy(starts, ends, ids) for ids in iter_id_batches(f, batch_size))
+    return fresh, sum((end - start + 1) for start, end in merged)
+
+
+class IntervalSet:
+    """Mutable set of IDs kept as sorted, disjoint, non-touching spans.
+
+    Spans are stored as a list of blocks of at most `2 * _LOAD` spans each
+    (parallel lists of starts and ends), plus the last end of every
+    block. `add` and `discard` binary-search the block index and then the
+    block, and splice only that block, so an update costs O(log spans +
+    _LOAD) rather than moving every later span. Spans that an update
+    merges away are removed in bulk; each can be removed at most once
+    after it is created. `total` (the number of IDs covered, as in
+    `partb`) is updated by the difference only.
+    """
+
+    _LOAD = 1000
+
+    def __init__(self, ranges: Iterable[Tuple[int, int]] = ()):
+        merged = merge_ranges(list(ranges))
+        load = self._LOAD
+        self._starts = [[start for start, _ in merged[i:i + load]] for i in range(0, len(merged), load)]
+        self._ends = [[end for _, end in merged[i:i + load]] for i in range(0, len(merged), load)]
+        self._maxes = [ends[-1] for ends in self._ends]
+        self.total = sum((end - start + 1) for start, end in merged)
+
+    def __len__(self) -> int:
+        """Number of disjoint spans."""
+        return sum(len(starts) for starts in self._starts)
+
+    def __iter__(self) -> Iterator[Tuple[int, int]]:
+        for starts, ends in zip(self._starts, self._ends):
+            yield from zip(starts, ends)
+
+    def __contains__(self, id_val: int) -> bool:
+        b = bisect_left(self._maxes, id_val)  # block of the first span ending at or after id_val
+        if b == len(self._maxes):
+            return False
+        k = bisect_left(self._ends[b], id_val)
+        return self._starts[b][k] <= id_val
+
+    def _take(self, lo: int, hi: int) -> List[Tuple[int, int]]:
+        """Remove and return every span that ends at or after `lo` and starts at or before `hi`."""
+        taken: List[Tuple[int, int]] = []
+        b = bisect_left(self._maxes, lo)
+        k = bisect_left(self._ends[b], lo) if b < len(self._maxes) else 0
+        while b < len(self._maxes):
+            starts, ends = self._starts[b], self._ends[b]
+            k2 = bisect_right(starts, hi, k)
+            more = k2 == len(starts)  # the run may continue into the next block
+            taken.extend(zip(starts[k:k2], ends[k:k2]))
+            del starts[k:k2]
+            del ends[k:k2]
+            if not starts:
+                del self._starts[b], self._ends[b], self._maxes[b]
+            else:
+                self._maxes[b] = ends[-1]
+                b += 1
+            if not more:
+                break
+            k = 0
+        self.total -= sum(end - start + 1 for start, end in taken)
+        return taken
+
+    def _insert(self, start: int, end: int) -> None:
+        """Insert a span that overlaps and touches no stored span."""
+        self.total += end - start + 1
+        if not self._maxes:
+            self._starts.append([start])
+            self._ends.append([end])
+            self._maxes.append(end)
+            return
+        b = min(bisect_left(self._maxes, start), len(self._maxes) - 1)
+        starts, ends = self._starts[b], self._ends[b]
+        k = bisect_left(ends, start)
+        starts.insert(k, start)
+        ends.insert(k, end)
+        self._maxes[b] = ends[-1]
+        if len(starts) > 2 * self._LOAD:
+            half = len(starts) // 2
+            self._starts[b + 1:b + 1] = [starts[half:]]
+            self._ends[b + 1:b + 1] = [ends[half:]]
+            self._maxes[b:b + 1] = [ends[half - 1], ends[-1]]
+            del starts[half:], ends[half:]
+
+    def add(self, start: int, end: int) -> None:
+        """Mark IDs start..end (inclusive) fresh."""
+        if start > end:
+            return
+        taken = self._take(start - 1, end + 1)  # overlapping or touching
+        if taken:
+            start = min(start, taken[0][0])
+            end = max(end, taken[-1][1])
+        self._insert(start, end)
+
+    def discard(self, start: int, end: int) -> None:
+        """Mark IDs start..end (inclusive) no longer fresh."""
+        if start > end:
+            return
+        taken = self._take(start, end)  # overlapping
+        if not taken:
+            return
+        if taken[0][0] < start:
+            self._insert(taken[0][0], start - 1)
+        if taken[-1][1] > end:
+            self._insert(end + 1, taken[-1][1])
+
+
+_INDEX_HEADER = struct.Struct("<8sQQ")  # magic, range count, total fresh IDs
+_INDEX_MAGIC = b"AOC5IDX2"
+
+
+def range_section_digest(stream: BinaryIO) -> str:
+    """Hash the raw range section of `stream`, leaving it positioned at the IDs."""
+    digest = hashlib.sha256()
+    for line in iter(stream.readline, b""):
+        if not line.strip():
+            break
+        digest.update(line)
+    return digest.hexdigest()
+
+
+def write_index(path: str, merged: List[Tuple[int, int]]) -> None:
+    """Store merged ranges as a header, then all starts, then all ends (int64 LE).
+
+    The header also records the number of IDs the ranges cover (part B).
+    """
+    starts, ends = interval_arrays(merged)
+    total_fresh = sum((end - start + 1) for start, end in merged)
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as f:
+        f.write(_INDEX_HEADER.pack(_INDEX_MAGIC, len(merged), total_fresh))
+        f.write(starts.astype("<i8").tobytes())
+        f.write(ends.astype("<i8").tobytes())
+    os.replace(tmp, path)  # readers never see a half-written index
+
+
+def load_index(path: str) -> Tuple[np.ndarray, np.ndarray, int]:
+    """Memory-map an index written by `write_index`.
+
+    Returns (starts, ends, total_fresh), the arrays being views of the map.
+    """
+    with open(path, "rb") as f:
+        mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    if len(mm) < _INDEX_HEADER.size:
+        raise ValueError(f"{path} is not a range index")
+    magic, n, total_fresh = _INDEX_HEADER.unpack_from(mm)
+    if magic != _INDEX_MAGIC:
+        raise ValueError(f"{path} is not a range index")
+    # The arrays keep the mapping alive; nothing is copied.
+    starts = np.frombuffer(mm, dtype="<i8", count=n, offset=_INDEX_HEADER.size)
+    ends = np.frombuffer(mm, dtype="<i8", count=n, offset=_INDEX_HEADER.size + 8 * n)
+    return starts, ends, total_fresh
+
+
+def solve_indexed(path: str, index_dir: str, batch_size: int = 1 << 20) -> Tuple[int, int]:
+    """Like `solve_numpy`, but reuse a cached merged-range index when possible.
+
+    The index file is named after a hash of the range section's bytes. On
+    a hit the ranges are neither parsed nor sorted; on a miss they are
+    merged once and the index is written for later runs. An index in an
+    older format is rebuilt the same way.
+    """
+    with open(path, "rb") as f:
+        digest = range_section_digest(f)
+        ids_at = f.tell()
+        index_path = os.path.join(index_dir, digest + ".idx")
+        try:
+            starts, ends, total_fresh = load_index(index_path)
+        except (OSError, ValueError):
+            f.seek(0)
+            merged = merge_ranges(read_ranges(f))
+            os.makedirs(index_dir, exist_ok=True)
+            write_index(index_path, merged)
+            starts, ends, total_fresh = load_index(index_path)
+            f.seek(ids_at)
+        fresh = sum(count_fresh_numpy(starts, ends, ids) for ids in iter_id_batches(f, batch_size))
+    return fresh, total_fresh
+
+
 def main():
     parser = argparse.ArgumentParser(description="Run part A and part B for day 5")
     parser.add_argument("input", nargs="?", default="aoc5i.txt", help="input file path")
+    parser.add_argument("--numpy", action="store_true",
+                        help="classify IDs in vectorized batches without loading the whole file")
+    parser.add_argument("--batch-size", type=int, default=1 << 20, help="bytes of IDs per batch with --numpy")
+    parser.add_argument("--index-dir",
+                        help="cache merged ranges here, keyed by the range section hash (implies --numpy)")
     args = parser.parse_args()
 
-    with open(args.input, "r", encoding="utf-8") as f:
-        content = f.read()
+    if args.index_dir:
+        a, b = solve_indexed(args.input, args.index_dir, args.batch_size)
+    elif args.numpy:
+        a, b = solve_numpy(args.input, args.batch_size)
+    else:
+        with open(args.input, "r", encoding="utf-8") as f:
+            content = f.read()
 
-    a = parta(content)
-    b = partb(content)
+        a = parta(content)
+        b = partb(content)
 
     print("Part A - Count of fresh IDs:", a)
     print("Part B - Count of unique fresh IDs (merged ranges):", b)
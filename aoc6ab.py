@@ -2,139 +2,347 @@
 
 Provides `parta(lines)` which solves the worksheet (left-to-right column processing)
 and `partb(lines)` which solves the worksheet (right-to-left column processing).
-`main()` reads the input file once and prints both results.
+Both read the same block descriptors from `parse_blocks(lines)`;
+`solve(lines)` produces both answers from a single parse and
+`solve_stream(path)` does the same on a memory-mapped worksheet read in
+column windows. Operators come from the `OPERATORS` table (`*` uses a
+balanced product tree) and every entry point can reduce its answers
+modulo a given value. `solve_parallel(blocks)` evaluates batches of
+blocks in worker processes and reduces their partial results. `main()`
+reads the input file once and prints both results.
 """
-from typing import List
+from contextlib import contextmanager
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from typing import Callable, Dict, Iterable, Iterator, List, NamedTuple, Optional, Sequence, Tuple
 import argparse
+import mmap
+import os
 
+import numpy as np
 
-def solve_worksheet_parta(lines: List[str]) -> int:
-    """Part A: Process columns left-to-right, extracting numbers in order."""
-    # Normalize row length
-    width = max(len(line) for line in lines) if lines else 0
-    grid = [line.ljust(width) for line in lines]
-
-    # Transpose: column-wise extraction
-    columns = [''.join(grid[r][c] for r in range(len(grid))) for c in range(width)]
-
-    # Segment columns into problems
-    problems = []
-    current = []
 
-    for col in columns:
-        if col.strip():
-            current.append(col)
-        else:
-            if current:
-                problems.append(current)
-                current = []
-    if current:
-        problems.append(current)
-
-    grand_total = 0
-
-    for problem in problems:
-        # Rebuild rows inside this problem block
-        rows = [''.join(col[r] for col in problem) for r in range(len(lines))]
-
-        # Last row is operator
-        op = rows[-1].strip()
-
-        # All above rows are numbers (if present)
-        nums = [int(r.strip()) for r in rows[:-1] if r.strip()]
-
-        # Execute the operation
-        if op == '+':
-            result = sum(nums)
-        elif op == '*':
-            result = 1
-            for n in nums:
-                result *= n
-        else:
-            raise ValueError(f"Unexpected operator found: {op}")
+class Block(NamedTuple):
+    """One problem: its column span, operator and digit rows (an S1 sub-matrix)."""
 
-        grand_total += result
+    start: int
+    end: int
+    op: str
+    digits: np.ndarray
 
-    return grand_total
 
+def parse_blocks(lines: List[str]) -> List[Block]:
+    """Scan the worksheet once and split it into problem blocks.
 
-def solve_worksheet_partb(lines: List[str]) -> int:
-    """Part B: Process columns right-to-left, extracting digits from each column."""
-    # Normalize row length
+    The padded worksheet becomes a `rows x width` S1 array; problems are
+    separated by columns that are blank in every row. The last row holds
+    the operator, the rows above it the digits.
+    """
     width = max(len(line) for line in lines) if lines else 0
-    grid = [line.ljust(width) for line in lines]
+    if not width:
+        return []
+    text = "".join(line.ljust(width) for line in lines).encode("ascii")
+    grid = np.frombuffer(text, dtype="S1").reshape(len(lines), width)
 
-    # Transpose into columns
-    columns = [''.join(grid[r][c] for r in range(len(grid))) for c in range(width)]
+    # Boundaries of the runs of non-blank columns
+    filled = np.concatenate(([False], (grid != b" ").any(axis=0), [False]))
+    edges = np.flatnonzero(filled[1:] != filled[:-1])
 
-    # Split columns into problem blocks
-    problems = []
-    current = []
+    return [_make_block(int(start), grid[:, start:end]) for start, end in zip(edges[::2], edges[1::2])]
 
-    for col in columns:
-        if col.strip():
-            current.append(col)
-        else:
-            if current:
-                problems.append(current)
-                current = []
-    if current:
-        problems.append(current)
-
-    grand_total = 0
-
-    for block in problems:
-        # Last row is the operator
-        op_row_index = len(lines) - 1
-        operator = block[0][op_row_index]  # operator is same in all columns
-
-        # Extract numbers column-by-column
-        numbers = []
-
-        # For each column, read digits top→bottom except last row
-        # Then reverse the order: right→left processing
-        for col in reversed(block):  # rightmost column first
-            digits = col[:op_row_index]  # exclude operator row
-            digits = ''.join(d for d in digits if d.isdigit())
-
-            if digits:  # skip empty columns
-                numbers.append(int(digits))
-
-        # Compute result
-        if operator == '+':
-            result = sum(numbers)
-        elif operator == '*':
-            result = 1
-            for n in numbers:
-                result *= n
-        else:
-            raise ValueError(f"Unexpected operator: {operator}")
 
-        grand_total += result
+def _make_block(start: int, cells: np.ndarray) -> Block:
+    """Build a Block from its full-height S1 columns starting at column `start`."""
+    op = cells[-1].tobytes().decode("ascii").strip()
+    return Block(start, start + cells.shape[1], op, cells[:-1])
+
 
-    return grand_total
+def row_numbers(block: Block) -> List[int]:
+    """Part A reading: each digit row is one number."""
+    rows = (row.tobytes().decode("ascii").strip() for row in block.digits)
+    return [int(r) for r in rows if r]
+
+
+def column_numbers(block: Block) -> List[int]:
+    """Part B reading: each column, rightmost first, is one number read top to bottom."""
+    numbers = []
+    for col in block.digits.T[::-1]:
+        digits = "".join(d for d in col.tobytes().decode("ascii") if d.isdigit())
+        if digits:  # skip empty columns
+            numbers.append(int(digits))
+    return numbers
+
+
+def product_tree(numbers: Sequence[int]) -> int:
+    """Multiply `numbers` pairwise, level by level.
+
+    Operands of similar size are multiplied together, which keeps big-int
+    multiplication far cheaper than a left-to-right running product.
+    """
+    values = list(numbers)
+    if not values:
+        return 1
+    while len(values) > 1:
+        paired = [values[i] * values[i + 1] for i in range(0, len(values) - 1, 2)]
+        if len(values) % 2:
+            paired.append(values[-1])
+        values = paired
+    return values[0]
+
+
+def _product_mod(numbers: Sequence[int], modulus: int) -> int:
+    result = 1 % modulus
+    for n in numbers:
+        result = result * n % modulus
+    return result
+
+
+class Operator(NamedTuple):
+    exact: Callable[[Sequence[int]], int]
+    # (numbers, modulus) -> result % modulus
+    modular: Callable[[Sequence[int], int], int]
+
+
+# operator symbol -> implementation; extend with `register_operator`
+OPERATORS: Dict[str, Operator] = {}
+
+
+def register_operator(
+    symbol: str,
+    exact: Callable[[Sequence[int]], int],
+    modular: Optional[Callable[[Sequence[int], int], int]] = None,
+) -> None:
+    """Add an operator. Without `modular`, the exact result is reduced."""
+    if modular is None:
+        def modular(numbers: Sequence[int], modulus: int) -> int:
+            return exact(numbers) % modulus
+    OPERATORS[symbol] = Operator(exact, modular)
+
+
+register_operator('+', sum, lambda numbers, modulus: sum(n % modulus for n in numbers) % modulus)
+register_operator('*', product_tree, _product_mod)
+
+
+def evaluate(op: str, numbers: List[int], modulus: Optional[int] = None) -> int:
+    """Apply operator `op`; with `modulus`, return the result modulo it."""
+    try:
+        operator = OPERATORS[op]
+    except KeyError:
+        raise ValueError(f"Unexpected operator: {op}") from None
+    if modulus is None:
+        return operator.exact(numbers)
+    return operator.modular(numbers, modulus)
+
+
+def _totals(blocks: Iterable[Block], modulus: Optional[int] = None) -> Tuple[int, int]:
+    total_a = total_b = 0
+    for block in blocks:
+        total_a += evaluate(block.op, row_numbers(block), modulus)
+        total_b += evaluate(block.op, column_numbers(block), modulus)
+    if modulus is not None:
+        total_a %= modulus
+        total_b %= modulus
+    return total_a, total_b
+
+
+def solve(lines: List[str], modulus: Optional[int] = None) -> Tuple[int, int]:
+    """Return (part A, part B) from one parse of the worksheet."""
+    return _totals(parse_blocks(lines), modulus)
+
+
+def _row_spans(mm: mmap.mmap) -> List[Tuple[int, int]]:
+    """Return (offset, length) of every row of a mapped worksheet."""
+    spans = []
+    pos = 0
+    size = len(mm)
+    while pos < size:
+        nl = mm.find(b"\n", pos)
+        end = size if nl < 0 else nl
+        length = end - pos
+        if length and mm[end - 1:end] == b"\r":
+            length -= 1
+        spans.append((pos, length))
+        pos = end + 1
+    return spans
+
+
+def iter_blocks_windowed(mm: mmap.mmap, window: int = 1 << 16) -> Iterator[Block]:
+    """Yield the blocks of a mapped worksheet, reading `window` columns at a time.
+
+    All rows are read in lockstep, one column window at a time; short rows
+    are padded with spaces. A block is yielded as soon as the blank column
+    ending it is seen, so only the current window and the unfinished block
+    are held in memory.
+    """
+    if window <= 0:
+        raise ValueError("window must be positive")
+    spans = _row_spans(mm)
+    if not spans:
+        return
+    width = max(length for _, length in spans)
+    pending: List[np.ndarray] = []  # columns of the unfinished block
+    pending_start = 0
+    for c0 in range(0, width, window):
+        w = min(window, width - c0)
+        chunks = []
+        for offset, length in spans:
+            lo, hi = offset + min(c0, length), offset + min(c0 + w, length)
+            chunks.append(mm[lo:hi].ljust(w))
+        win = np.frombuffer(b"".join(chunks), dtype="S1").reshape(len(spans), w)
+
+        pos = 0
+        for blank in np.flatnonzero((win == b" ").all(axis=0)):
+            if pending or blank > pos:
+                if not pending:
+                    pending_start = c0 + pos
+                pending.append(win[:, pos:blank])
+                yield _make_block(pending_start, np.concatenate(pending, axis=1))
+                pending = []
+            pos = blank + 1
+        if pos < w:
+            if not pending:
+                pending_start = c0 + pos
+            pending.append(win[:, pos:])
+    if pending:
+        yield _make_block(pending_start, np.concatenate(pending, axis=1))
+
+
+@contextmanager
+def _mapped_blocks(path: str, window: int = 1 << 16) -> Iterator[Iterator[Block]]:
+    """Map the worksheet at `path` and yield its windowed block stream.
+
+    An empty file cannot be mapped and simply has no blocks.
+    """
+    with open(path, "rb") as f:
+        if not os.fstat(f.fileno()).st_size:
+            yield iter(())
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            yield iter_blocks_windowed(mm, window)
+
+
+def solve_stream(path: str, window: int = 1 << 16, modulus: Optional[int] = None) -> Tuple[int, int]:
+    """Return (part A, part B) for a memory-mapped worksheet, block by block."""
+    with _mapped_blocks(path, window) as blocks:
+        return _totals(blocks, modulus)
+
+
+def _product_pieces(block: Block, batch_size: int) -> Iterator[Tuple[int, Block]]:
+    """Split a `*` block into (reading, sub-block) pieces of about `batch_size` cells.
+
+    Reading 0 (part A) takes whole digit rows, reading 1 (part B) whole
+    columns, so every piece's operands are complete numbers and the block
+    result is the product of the pieces' products.
+    """
+    rows, cols = block.digits.shape
+    step = max(1, batch_size // max(cols, 1))
+    for r0 in range(0, rows, step):
+        yield 0, block._replace(digits=block.digits[r0:r0 + step])
+    step = max(1, batch_size // max(rows, 1))
+    for c0 in range(0, cols, step):
+        yield 1, block._replace(digits=block.digits[:, c0:c0 + step])
+
+
+def _piece_product(reading: int, piece: Block, modulus: Optional[int]) -> int:
+    numbers = row_numbers(piece) if reading == 0 else column_numbers(piece)
+    return evaluate('*', numbers, modulus)
+
+
+def solve_parallel(
+    blocks: Iterable[Block],
+    workers: Optional[int] = None,
+    batch_size: int = 1 << 16,
+    modulus: Optional[int] = None,
+) -> Tuple[int, int]:
+    """Return (part A, part B) evaluating blocks across a process pool.
+
+    Consecutive blocks are batched until they hold `batch_size` digit
+    cells, and each batch comes back as two partial sums. A `*` block
+    larger than that is split into row and column pieces whose partial
+    products are multiplied together in the parent. At most a few tasks
+    per worker are in flight, so `blocks` may be a lazy stream.
+    """
+    workers = workers or os.cpu_count() or 1
+    totals = [0, 0]
+    products: Dict[Tuple[int, int], List[int]] = {}
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        in_flight: Dict[Future, Optional[Tuple[int, int]]] = {}
+
+        def drain(limit: int) -> None:
+            while len(in_flight) > limit:
+                done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                for fut in done:
+                    key = in_flight.pop(fut)
+                    if key is None:
+                        a, b = fut.result()
+                        totals[0] += a
+                        totals[1] += b
+                    else:
+                        products[key].append(fut.result())
+
+        def submit(key: Optional[Tuple[int, int]], fn: Callable, *args) -> None:
+            drain(workers * 4)
+            in_flight[pool.submit(fn, *args)] = key
+
+        batch: List[Block] = []
+        cells = 0
+        for index, block in enumerate(blocks):
+            if block.op == '*' and block.digits.size > batch_size:
+                for reading, piece in _product_pieces(block, batch_size):
+                    products.setdefault((index, reading), [])
+                    submit((index, reading), _piece_product, reading, piece, modulus)
+                continue
+            batch.append(block)
+            cells += block.digits.size
+            if cells >= batch_size:
+                submit(None, _totals, batch, modulus)
+                batch, cells = [], 0
+        if batch:
+            submit(None, _totals, batch, modulus)
+        drain(0)
+
+    for (_, reading), partials in products.items():
+        totals[reading] += evaluate('*', partials, modulus)
+    if modulus is not None:
+        return totals[0] % modulus, totals[1] % modulus
+    return totals[0], totals[1]
 
 
 def parta(lines: List[str]) -> int:
     """Part A: left-to-right processing."""
-    return solve_worksheet_parta(lines)
+    return sum(evaluate(b.op, row_numbers(b)) for b in parse_blocks(lines))
 
 
 def partb(lines: List[str]) -> int:
     """Part B: right-to-left processing."""
-    return solve_worksheet_partb(lines)
+    return sum(evaluate(b.op, column_numbers(b)) for b in parse_blocks(lines))
 
 
 def main():
     parser = argparse.ArgumentParser(description="Run part A and part B for day 6")
     parser.add_argument("input", nargs="?", default="aoc6i.txt", help="input file path")
+    parser.add_argument("--stream", action="store_true",
+                        help="memory-map the worksheet and scan it in column windows")
+    parser.add_argument("--window", type=int, default=1 << 16, help="columns per window with --stream")
+    parser.add_argument("--mod", type=int, help="report both answers modulo this value")
+    parser.add_argument("--workers", type=int, default=1, help="evaluate problem blocks across this many processes")
+    parser.add_argument("--batch-size", type=int, default=1 << 16,
+                        help="digit cells per task with --workers; larger * blocks are split")
     args = parser.parse_args()
 
-    with open(args.input, "r", encoding="utf-8") as f:
-        lines = [line.rstrip("\n") for line in f]
-
-    a = parta(lines)
-    b = partb(lines)
+    if args.stream and args.workers > 1:
+        with _mapped_blocks(args.input, args.window) as blocks:
+            a, b = solve_parallel(blocks, args.workers, args.batch_size, args.mod)
+    elif args.stream:
+        a, b = solve_stream(args.input, args.window, args.mod)
+    else:
+        with open(args.input, "r", encoding="utf-8") as f:
+            lines = [line.rstrip("\n") for line in f]
+
+        if args.workers > 1:
+            a, b = solve_parallel(parse_blocks(lines), args.workers, args.batch_size, args.mod)
+        else:
+            a, b = solve(lines, args.mod)
 
     print("Part A (left-to-right):", a)
     print("Part B (right-to-left):", b)